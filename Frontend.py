@@ -1,15 +1,15 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 
-def is_leap(year: int) -> bool:
-    if year % 400 == 0:
-        return True
-    elif year % 100 == 0:
-        return False
-    elif year % 4 == 0:
-        return True
-    else:
-        return False
+from leap_core import df_cache_key, leap_mask, normalize_bool_column
+
+
+@st.cache_data(hash_funcs={pd.DataFrame: df_cache_key})
+def leap_partitions(df):
+    """Split into (leap, non-leap) views once per dataset instead of per rerun."""
+    mask = df["Is_Leap_Year"].to_numpy()
+    return df[mask], df[~mask]
 
 st.title("Leap Year Dataset – Front End Design")
 
@@ -18,21 +18,25 @@ uploaded_file = st.file_uploader("Upload Leap Year CSV file", type=["csv"])
 
 # If no file is uploaded, create a simple sample dataset
 if uploaded_file is not None:
-    df = pd.read_csv(uploaded_file)
+    try:
+        # Explicit dtypes skip pandas' inference pass for the known schema
+        df = pd.read_csv(uploaded_file, dtype={"Year": "Int32", "Is_Leap_Year": "boolean"})
+    except (TypeError, ValueError):
+        uploaded_file.seek(0)
+        df = pd.read_csv(uploaded_file)
 else:
     st.info("No file uploaded. Using sample dataset from 1900 to 2050.")
-    years = list(range(1900, 2051))
+    years = np.arange(1900, 2051, dtype=np.int32)
     df = pd.DataFrame({
         "Year": years,
-        "Is_Leap_Year": [is_leap(y) for y in years]
+        "Is_Leap_Year": leap_mask(years)
     })
 
 st.subheader("Original Data (First 10 Rows)")
-st.write(df.head(10))
+st.dataframe(df.head(10), use_container_width=True)
 
-# Ensure Is_Leap_Year is boolean
-if df["Is_Leap_Year"].dtype != bool:
-    df["Is_Leap_Year"] = df["Is_Leap_Year"].astype(str).str.lower().isin(["true", "1", "yes"])
+# Ensure Is_Leap_Year is boolean (no-op when the dtype is already bool/int)
+df["Is_Leap_Year"] = normalize_bool_column(df["Is_Leap_Year"])
 
 st.subheader("Filter Options")
 
@@ -41,13 +45,14 @@ filter_type = st.radio(
     ["All Years", "Only Leap Years", "Only Non-Leap Years", "Years Greater Than..."]
 )
 
-filtered_df = df.copy()
+filtered_df = df
+leap_df, non_leap_df = leap_partitions(df)
 
 if filter_type == "Only Leap Years":
-    filtered_df = df[df["Is_Leap_Year"] == True]
+    filtered_df = leap_df
 
 elif filter_type == "Only Non-Leap Years":
-    filtered_df = df[df["Is_Leap_Year"] == False]
+    filtered_df = non_leap_df
 
 elif filter_type == "Years Greater Than...":
     min_year = int(df["Year"].min())
@@ -55,5 +60,7 @@ elif filter_type == "Years Greater Than...":
     year_limit = st.slider("Select minimum year:", min_year, max_year, min_year)
     filtered_df = df[df["Year"] > year_limit]
 
+# st.dataframe ships the frame as Arrow and paginates client-side, so a
+# filter that matches the whole dataset doesn't render one giant table
 st.subheader("Filtered Result")
-st.write(filtered_df)
+st.dataframe(filtered_df, use_container_width=True)
@@ -1,41 +1,41 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 
-# Helper function
-def leap_reason(year):
-    if year % 400 == 0:
-        return "Divisible by 400"
-    elif year % 100 == 0:
-        return "Divisible by 100 but not 400"
-    elif year % 4 == 0:
-        return "Divisible by 4 but not 100"
-    else:
-        return "Not divisible by 4"
+from leap_core import REASONS, leap_mask, reason_codes
 
 st.title("Leap Year Dataset – Grouping Analysis")
 
 uploaded_file = st.file_uploader("Upload Leap Year CSV file", type=["csv"])
 
 if uploaded_file is not None:
-    df = pd.read_csv(uploaded_file)
+    try:
+        # Explicit dtypes skip pandas' inference pass for the known schema
+        df = pd.read_csv(uploaded_file, dtype={"Year": "Int32", "Is_Leap_Year": "boolean"})
+    except (TypeError, ValueError):
+        uploaded_file.seek(0)
+        df = pd.read_csv(uploaded_file)
 else:
     st.info("No file uploaded. Using sample dataset for grouping example.")
-    years = list(range(1900, 2051))
+    years = np.arange(1900, 2051, dtype=np.int32)
     df = pd.DataFrame({
         "Year": years,
-        "Is_Leap_Year": [year % 400 == 0 or (year % 4 == 0 and year % 100 != 0) for year in years]
+        "Is_Leap_Year": leap_mask(years)
     })
 
 # Create derived columns
 df["Leap_Code"] = df["Is_Leap_Year"].astype(int)
-df["Leap_Reason"] = df["Year"].apply(leap_reason)
-
-# Create year group ranges
-df["Year_Group"] = pd.cut(
-    df["Year"],
-    bins=[0, 1949, 1999, 2100],
-    labels=["Before 1950", "1950–1999", "2000 and later"],
-    include_lowest=True
+df["Leap_Reason"] = pd.Categorical.from_codes(
+    reason_codes(df["Year"].to_numpy(dtype=np.float64)), categories=list(REASONS)
+)
+
+# Create year group ranges via binary search over the two bin edges
+edges = np.array([1950, 2000], dtype=np.int32)
+years_f = df["Year"].to_numpy(dtype=np.float64)
+group_codes = np.searchsorted(edges, years_f, side="right").astype(np.int8)
+group_codes[np.isnan(years_f)] = -1
+df["Year_Group"] = pd.Categorical.from_codes(
+    group_codes, categories=["Before 1950", "1950–1999", "2000 and later"]
 )
 
 st.subheader("Select Grouping Column")
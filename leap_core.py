@@ -0,0 +1,144 @@
+"""Shared leap-year primitives for the Streamlit apps.
+
+All three front-ends (leap_year_app, Frontend, Grouping) apply the same
+Gregorian leap rule. Keeping one vectorized implementation here means
+every optimization — dtypes, the Numba kernel — lands in a single place
+instead of three copies.
+"""
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+REASONS = (
+    "Divisible by 400",
+    "Divisible by 100 but not 400",
+    "Divisible by 4 but not 100",
+    "Not divisible by 4",
+    "Invalid year",
+)
+
+# Row count above which the fused Numba kernel beats the NumPy path
+_NUMBA_MIN_ROWS = 100_000
+
+if _HAS_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _leap_kernel(y, leap_out, code_out):  # pragma: no cover - compiled
+        for i in prange(y.size):
+            yi = y[i]
+            if yi % 400 == 0:
+                leap_out[i] = True
+                code_out[i] = 0
+            elif yi % 100 == 0:
+                leap_out[i] = False
+                code_out[i] = 1
+            elif yi % 4 == 0:
+                leap_out[i] = True
+                code_out[i] = 2
+            else:
+                leap_out[i] = False
+                code_out[i] = 3
+
+
+def leap_mask(years: np.ndarray) -> np.ndarray:
+    """Boolean leap mask for an array of years (NaN years come out False)."""
+    y = np.asarray(years)
+    return ((y % 400) == 0) | (((y % 4) == 0) & ((y % 100) != 0))
+
+
+def reason_codes(years: np.ndarray) -> np.ndarray:
+    """int8 index into REASONS for each year (NaN years map to "Invalid year")."""
+    y = np.asarray(years, dtype=np.float64)
+    codes = np.where(
+        y % 400 == 0, 0, np.where(y % 100 == 0, 1, np.where(y % 4 == 0, 2, 3))
+    ).astype(np.int8)
+    codes[np.isnan(y)] = 4
+    return codes
+
+
+def leap_flags_and_codes(y: np.ndarray):
+    """Compute the leap mask and int8 reason codes for float year values.
+
+    Large inputs go through a fused Numba kernel that writes both outputs
+    in a single parallel pass with no temporaries; smaller ones (or
+    installs without numba) use the vectorized modulo passes. NaN years
+    come out non-leap with the "Invalid year" code.
+    """
+    nan_mask = np.isnan(y)
+    if _HAS_NUMBA and y.size > _NUMBA_MIN_ROWS:
+        # Substitute a harmless non-leap year for NaN; fixed up below
+        yi = np.where(nan_mask, 1, y).astype(np.int64)
+        leap = np.empty(y.size, dtype=np.bool_)
+        codes = np.empty(y.size, dtype=np.int8)
+        _leap_kernel(yi, leap, codes)
+    else:
+        leap = leap_mask(y)
+        codes = np.where(
+            y % 400 == 0, 0, np.where(y % 100 == 0, 1, np.where(y % 4 == 0, 2, 3))
+        ).astype(np.int8)
+    if nan_mask.any():
+        leap &= ~nan_mask
+        codes[nan_mask] = 4
+    return leap, codes
+
+
+def df_cache_key(df: pd.DataFrame):
+    """Cheap surrogate hash for st.cache_data's hash_funcs.
+
+    Streamlit's default DataFrame hashing walks the full contents on
+    every cache lookup, which can dwarf the cached function itself.
+    Shape, dtypes and a row-hash of the first thousand rows are enough
+    to tell datasets apart at O(1)-bounded cost.
+    """
+    head_hash = int(pd.util.hash_pandas_object(df.head(1000), index=True).sum())
+    return (df.shape, tuple(map(str, df.dtypes)), head_hash)
+
+
+# Recognized spellings of a leap flag in uploaded CSVs (lowercased)
+_TRUTHY = {
+    "true": True,
+    "1": True,
+    "yes": True,
+    "false": False,
+    "0": False,
+    "no": False,
+}
+
+
+def normalize_bool_column(s: pd.Series) -> pd.Series:
+    """Coerce a leap-flag column of mixed truthy values to plain bool.
+
+    Already-boolean columns are a single cast, numeric ones one
+    comparison; only genuine string columns pay for the per-element
+    dict lookup (unrecognized values count as False).
+    """
+    if pd.api.types.is_bool_dtype(s):
+        return s.fillna(False).astype(bool)
+    if pd.api.types.is_numeric_dtype(s):
+        return s.fillna(0).astype(bool)
+    return (
+        s.astype(str).str.strip().str.lower().map(_TRUTHY).fillna(False).astype(bool)
+    )
+
+
+def is_leap_scalar(year) -> bool:
+    """Return True if a single year is a leap year, else False."""
+    if pd.isna(year):
+        return False
+    year = int(year)
+    # Single branchless expression instead of a modulo/branch chain
+    return bool((year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0)))
+
+
+def leap_reason_scalar(year) -> str:
+    """Return textual explanation for a single year's leap status."""
+    if pd.isna(year):
+        return REASONS[4]
+    year = int(year)
+    code = 0 if year % 400 == 0 else 1 if year % 100 == 0 else 2 if year % 4 == 0 else 3
+    return REASONS[code]
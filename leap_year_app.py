@@ -2,47 +2,37 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from sklearn.preprocessing import MinMaxScaler
-from io import StringIO
+from io import BytesIO, StringIO
+
+from leap_core import (
+    REASONS,
+    df_cache_key,
+    is_leap_scalar as is_leap,
+    leap_flags_and_codes,
+    leap_mask,
+    leap_reason_scalar as leap_reason,
+    normalize_bool_column,
+)
+
+# Hash DataFrame-valued cache arguments with the cheap surrogate key
+# instead of streamlit's full-content hash
+_DF_HASH_FUNCS = {pd.DataFrame: df_cache_key}
+
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
 
 # ------------- Helper Functions -------------
 
-def is_leap(year: int) -> bool:
-    """Return True if a year is a leap year, else False."""
-    if pd.isna(year):
-        return False
-    year = int(year)
-    if year % 400 == 0:
-        return True
-    elif year % 100 == 0:
-        return False
-    elif year % 4 == 0:
-        return True
-    else:
-        return False
-
-
-def leap_reason(year: int) -> str:
-    """Return textual explanation for leap-year status."""
-    if pd.isna(year):
-        return "Invalid year"
-    year = int(year)
-    if year % 400 == 0:
-        return "Divisible by 400"
-    elif year % 100 == 0:
-        return "Divisible by 100 but not 400"
-    elif year % 4 == 0:
-        return "Divisible by 4 but not 100"
-    else:
-        return "Not divisible by 4"
-
-
-def create_sample_dataset():
-    """Create a leap_years dataframe in memory."""
-    years = list(range(1900, 2051))
+@st.cache_data
+def create_sample_dataset(start: int = 1900, end: int = 2051):
+    """Create a leap_years dataframe in memory for years [start, end)."""
+    years = np.arange(start, end, dtype=np.int32)
     data = {
         "Year": years,
-        "Is_Leap_Year": [is_leap(y) for y in years],
+        "Is_Leap_Year": leap_mask(years),
     }
     df = pd.DataFrame(data)
     return df
@@ -52,9 +42,11 @@ def ensure_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
     Make sure Year, Is_Leap_Year, Leap_Code, Leap_Reason, Year_Normalized exist.
     Works even if uploaded CSV does not have Is_Leap_Year column.
-    """
-    df = df.copy()
 
+    Adds the columns to df in place: callers go through the st.cache_data
+    wrappers, which already hand each caller its own copy, so an extra
+    defensive copy here would just double the per-dataset allocation.
+    """
     # 1. Ensure a 'Year' column exists (case-insensitive support)
     if "Year" not in df.columns:
         year_like = [c for c in df.columns if "year" in c.lower()]
@@ -66,42 +58,194 @@ def ensure_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
                 "Please ensure your CSV has a 'Year' column."
             )
 
-    # 2. Ensure Year is numeric
-    df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
-
-    # 3. Ensure Is_Leap_Year exists
-    if "Is_Leap_Year" not in df.columns:
-        # Create it from Year using our is_leap function
-        df["Is_Leap_Year"] = df["Year"].apply(is_leap)
+    # 2. Ensure Year is numeric; nullable Int32 keeps NaN support at half
+    # the width of the default int64/float64
+    df["Year"] = pd.to_numeric(df["Year"], errors="coerce").astype("Int32")
+
+    # 3. Ensure Is_Leap_Year exists. Flag and reason codes are computed
+    # together so large inputs do a single fused pass over Year.
+    need_leap = "Is_Leap_Year" not in df.columns
+    need_reason = "Leap_Reason" not in df.columns
+    if need_leap or need_reason:
+        leap, codes = leap_flags_and_codes(
+            df["Year"].to_numpy(dtype=np.float64, na_value=np.nan)
+        )
+    if need_leap:
+        df["Is_Leap_Year"] = leap
     else:
         # Standardize to boolean: handle 0/1, "true"/"false", "yes"/"no", etc.
-        if df["Is_Leap_Year"].dtype != bool:
-            df["Is_Leap_Year"] = (
-                df["Is_Leap_Year"]
-                .astype(str)
-                .str.strip()
-                .str.lower()
-                .isin(["true", "1", "yes"])
-            )
+        df["Is_Leap_Year"] = normalize_bool_column(df["Is_Leap_Year"])
 
-    # 4. Encoded leap code (0 / 1)
-    df["Leap_Code"] = df["Is_Leap_Year"].astype(int)
+    # 4. Encoded leap code (0 / 1); int8 is plenty for a flag
+    df["Leap_Code"] = df["Is_Leap_Year"].to_numpy().astype(np.int8)
 
-    # 5. Reason column
-    if "Leap_Reason" not in df.columns:
-        df["Leap_Reason"] = df["Year"].apply(leap_reason)
+    # 5. Reason column (vectorized equivalent of leap_reason).
+    # Built as a Categorical straight from int8 codes: four short strings
+    # shared across the whole column instead of one object per row.
+    if need_reason:
+        df["Leap_Reason"] = pd.Categorical.from_codes(codes, categories=list(REASONS))
+    else:
+        df["Leap_Reason"] = df["Leap_Reason"].astype("category")
 
-    # 6. Normalization for Year (ignoring NaNs)
-    scaler = MinMaxScaler()
-    # To avoid error if all years are NaN
+    # 6. Min-max normalization for Year (ignoring NaNs)
+    y = df["Year"].to_numpy(dtype=np.float64, na_value=np.nan)
     if df["Year"].notna().any():
-        df["Year_Normalized"] = scaler.fit_transform(df[["Year"]])
+        ymin = np.nanmin(y)
+        ymax = np.nanmax(y)
+        df["Year_Normalized"] = (y - ymin) / (ymax - ymin) if ymax > ymin else 0.0
     else:
         df["Year_Normalized"] = np.nan
 
     return df
 
 
+# Known schema for uploaded leap-year CSVs; passing it to read_csv skips
+# pandas' dtype-inference pass (extra keys are ignored for other files)
+_CSV_DTYPES = {"Year": "Int32", "Is_Leap_Year": "boolean"}
+
+# Above this size, read the CSV in chunks to keep peak memory bounded
+_CSV_CHUNK_BYTES = 64 * 1024 * 1024
+_CSV_CHUNK_ROWS = 1_000_000
+
+
+@st.cache_data
+def load_csv(file_bytes: bytes) -> pd.DataFrame:
+    """Parse an uploaded CSV once per unique file content.
+
+    When pyarrow is installed, the multithreaded Arrow CSV parser with
+    Arrow-backed columns is used instead: string columns become Arrow
+    strings rather than Python objects, at a fraction of the memory.
+    Known columns otherwise get explicit dtypes so pandas skips type
+    inference; files whose values don't fit them (e.g. yes/no leap
+    flags) fall back to plain inference and are normalized in
+    ensure_derived_columns.
+    """
+    try:
+        if _HAS_PYARROW and len(file_bytes) <= _CSV_CHUNK_BYTES:
+            return pd.read_csv(
+                BytesIO(file_bytes), engine="pyarrow", dtype_backend="pyarrow"
+            )
+        if len(file_bytes) > _CSV_CHUNK_BYTES:
+            chunks = pd.read_csv(
+                BytesIO(file_bytes), dtype=_CSV_DTYPES, chunksize=_CSV_CHUNK_ROWS
+            )
+            return pd.concat(chunks, ignore_index=True)
+        return pd.read_csv(BytesIO(file_bytes), dtype=_CSV_DTYPES)
+    except (TypeError, ValueError):
+        return pd.read_csv(BytesIO(file_bytes))
+
+
+@st.cache_data(hash_funcs=_DF_HASH_FUNCS)
+def prepare(df: pd.DataFrame) -> pd.DataFrame:
+    """Cached wrapper so derived columns are computed once per dataset."""
+    return ensure_derived_columns(df)
+
+
+def fast_stats(a: np.ndarray) -> dict:
+    """All Section 6 statistics for one numeric column from shared moments.
+
+    Count, sum and sum-of-squares are accumulated together and mean, var
+    and std derived from them, so the column is streamed far fewer times
+    than .agg's one full pass per reducer; the median uses NumPy's
+    partition-based selection. NaNs are skipped, and std/var use ddof=1
+    to match pandas.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    a = a[~np.isnan(a)]
+    n = a.size
+    if n == 0:
+        stats = dict.fromkeys(
+            ("sum", "mean", "median", "min", "max", "count", "std", "var"), np.nan
+        )
+        stats["count"] = 0
+        return stats
+    s = float(a.sum())
+    ss = float(np.dot(a, a))
+    mean = s / n
+    # Clamp: ss - n*mean^2 can come out a hair negative in floating point
+    var = max((ss - n * mean * mean) / (n - 1), 0.0) if n > 1 else np.nan
+    return {
+        "sum": s,
+        "mean": mean,
+        "median": float(np.median(a)),
+        "min": float(a.min()),
+        "max": float(a.max()),
+        "count": n,
+        "std": float(np.sqrt(var)),
+        "var": var,
+    }
+
+
+@st.cache_data(hash_funcs=_DF_HASH_FUNCS)
+def compute_describe(df: pd.DataFrame) -> pd.DataFrame:
+    """describe(include="all") scans every column; compute it once per dataset."""
+    return df.describe(include="all")
+
+
+@st.cache_data(hash_funcs=_DF_HASH_FUNCS)
+def compute_missing(df: pd.DataFrame) -> pd.Series:
+    """Per-column missing-value counts, cached per dataset."""
+    return df.isnull().sum()
+
+
+@st.cache_resource
+def build_figs(year_arr: np.ndarray, leap_code_arr: np.ndarray,
+               reason_labels: tuple, reason_counts: np.ndarray):
+    """Build the four Section 7 figures once per dataset.
+
+    Matplotlib figures are not picklable, hence st.cache_resource rather
+    than st.cache_data; the array/tuple arguments give the cache a stable
+    key so reruns reuse the already-rendered figures.
+    """
+    # Line plot
+    fig1, ax1 = plt.subplots()
+    ax1.plot(year_arr, leap_code_arr)
+    ax1.set_title("Line Plot of Leap Years Over Time")
+    ax1.set_xlabel("Year")
+    ax1.set_ylabel("Leap_Code (1 = Leap, 0 = Non-Leap)")
+    ax1.grid(True)
+
+    # Bar chart - Leap Reason counts
+    fig2, ax2 = plt.subplots()
+    ax2.bar(reason_labels, reason_counts)
+    ax2.set_title("Bar Chart of Leap Year Rules")
+    ax2.set_xlabel("Leap Rule Category")
+    ax2.set_ylabel("Count of Years")
+    plt.setp(ax2.get_xticklabels(), rotation=45, ha="right")
+    ax2.grid(True)
+
+    # Histogram (a 0/1 column only needs two counts, so skip
+    # matplotlib's binning and count with np.bincount)
+    leap_counts = np.bincount(leap_code_arr, minlength=2)
+    fig3, ax3 = plt.subplots()
+    ax3.bar(["Non-Leap", "Leap"], leap_counts)
+    ax3.set_title("Histogram of Leap vs Non-Leap Years")
+    ax3.set_xlabel("Leap_Code (0 = Non-Leap, 1 = Leap)")
+    ax3.set_ylabel("Frequency")
+    ax3.grid(True)
+
+    # Scatter plot
+    fig4, ax4 = plt.subplots()
+    ax4.scatter(year_arr, leap_code_arr)
+    ax4.set_title("Scatter Plot of Leap Years Over Time")
+    ax4.set_xlabel("Year")
+    ax4.set_ylabel("Leap_Code")
+    ax4.grid(True)
+
+    return fig1, fig2, fig3, fig4
+
+
+@st.cache_data(hash_funcs=_DF_HASH_FUNCS)
+def leap_partitions(df: pd.DataFrame):
+    """Split a dataset into (leap, non-leap) views once per dataset.
+
+    Reruns triggered by unrelated widgets then reuse the cached split
+    instead of rescanning the boolean column.
+    """
+    mask = df["Is_Leap_Year"].to_numpy()
+    return df[mask], df[~mask]
+
+
 # ------------- Main App -------------
 
 def main():
@@ -145,7 +289,7 @@ def main():
     )
 
     if uploaded_file is not None:
-        df = pd.read_csv(uploaded_file)
+        df = load_csv(uploaded_file.getvalue())
     else:
         if use_sample:
             df = create_sample_dataset()
@@ -153,8 +297,8 @@ def main():
             st.warning("Upload a CSV file or enable sample dataset.")
             return
 
-    # Make sure core derived columns exist
-    df = ensure_derived_columns(df)
+    # Make sure core derived columns exist (cached across reruns)
+    df = prepare(df)
 
     # --------- Section 1: Upload / Sample Data ---------
     if section == "1. Upload / Sample Data":
@@ -178,26 +322,31 @@ def main():
         st.subheader("2. Tail (Last 5 Rows)")
         st.write(df.tail())
 
+        # info/describe are full-table scans; only run them on request so
+        # reruns from unrelated widgets don't pay for them
         st.subheader("3. Info (Summary)")
-        buffer = StringIO()
-        df.info(buf=buffer)
-        info_str = buffer.getvalue()
-        st.text(info_str)
+        if st.button("Compute info()"):
+            buffer = StringIO()
+            df.info(buf=buffer)
+            st.text(buffer.getvalue())
 
         st.subheader("4. Describe (Statistical Summary)")
-        st.write(df.describe(include="all"))
+        if st.button("Compute describe()"):
+            st.write(compute_describe(df))
 
         st.subheader("5. Missing Values Check")
-        st.write(df.isnull().sum())
-        st.write("Any missing values? ", df.isnull().values.any())
-        st.write("Total missing values: ", int(df.isnull().values.sum()))
+        missing = compute_missing(df)
+        st.write(missing)
+        total_missing = int(missing.sum())
+        st.write("Any missing values? ", total_missing > 0)
+        st.write("Total missing values: ", total_missing)
 
     # --------- Section 3: Data Cleaning ---------
     elif section == "3. Data Cleaning":
         st.header("Task 2: Data Cleaning")
 
         st.subheader("Missing Values Before Cleaning")
-        st.write(df.isnull().sum())
+        st.write(compute_missing(df))
 
         # Drop NaNs
         df_dropna = df.dropna()
@@ -232,9 +381,10 @@ def main():
 
         st.subheader("Apply Transformations or Encoding on String Columns")
         df_str = df.copy()
+        # Leap_Reason is already categorical, so the codes come for free
+        df_str["Reason_Code"] = df_str["Leap_Reason"].cat.codes
         df_str["Leap_Reason"] = df_str["Leap_Reason"].astype("string")
         df_str["Is_Leap_Year"] = df_str["Is_Leap_Year"].astype("string")
-        df_str["Reason_Code"] = df_str["Leap_Reason"].astype("category").cat.codes
         df_str["Leap_Reason_Upper"] = df_str["Leap_Reason"].str.upper()
 
         st.write("Transformed String Columns (First 10 Rows):")
@@ -254,26 +404,29 @@ def main():
             horizontal=True
         )
 
+        leap_df, non_leap_df = leap_partitions(df)
         if filter_type == "Only Leap Years":
-            filtered = df[df["Is_Leap_Year"] == True]
+            filtered = leap_df
         elif filter_type == "Only Non-Leap Years":
-            filtered = df[df["Is_Leap_Year"] == False]
+            filtered = non_leap_df
         else:
             filtered = df
 
         st.write("Filtered Result:")
-        st.write(filtered.head(20))
+        # Arrow-serialized and paginated client-side, so the full filtered
+        # view is cheap to show (st.write would render it as one table)
+        st.dataframe(filtered, use_container_width=True)
 
         st.subheader("Filter by Year > Mean")
         mean_year = df["Year"].mean()
         st.write(f"Mean of Year: {mean_year:.2f}")
         filtered_mean = df[df["Year"] > mean_year]
         st.write("Rows where Year > mean:")
-        st.write(filtered_mean.head(20))
+        st.dataframe(filtered_mean, use_container_width=True)
 
         st.subheader("Multiple Conditions (Leap Years after 2000)")
-        filtered_multi = df[(df["Is_Leap_Year"] == True) & (df["Year"] > 2000)]
-        st.write(filtered_multi.head(20))
+        filtered_multi = df[df["Is_Leap_Year"] & (df["Year"] > 2000)]
+        st.dataframe(filtered_multi, use_container_width=True)
 
         st.subheader("Indexing with loc and iloc")
         st.write("Label-based (loc) – rows 0–5, Year & Is_Leap_Year:")
@@ -287,47 +440,46 @@ def main():
         st.header("Task 5: Aggregation and Grouping")
 
         st.subheader("Numeric Column Aggregation")
-        numeric_cols = df.select_dtypes(include=["int64", "float64"]).columns
+        numeric_cols = df.select_dtypes(include="number").columns
         st.write("Numeric Columns:", list(numeric_cols))
 
-        aggregations = df[numeric_cols].agg(
-            ["sum", "mean", "median", "min", "max", "count", "std", "var"]
-        )
+        aggregations = pd.DataFrame({
+            col: fast_stats(df[col].to_numpy(dtype=np.float64, na_value=np.nan))
+            for col in numeric_cols
+        })
         st.write("Statistical Summary:")
         st.write(aggregations)
 
         st.subheader("Grouping by Year Range")
         df_group = df.copy()
-        df_group["Year_Group"] = pd.cut(
-            df_group["Year"],
-            bins=[0, 1949, 1999, 2100],
-            labels=["Before 1950", "1950–1999", "2000 and later"],
-            include_lowest=True
+        # Two binary-search comparisons per row instead of pd.cut's
+        # IntervalIndex machinery; NaN years get code -1 (missing)
+        edges = np.array([1950, 2000], dtype=np.int32)
+        years = df_group["Year"].to_numpy(dtype=np.float64, na_value=np.nan)
+        codes = np.searchsorted(edges, years, side="right").astype(np.int8)
+        codes[np.isnan(years)] = -1
+        df_group["Year_Group"] = pd.Categorical.from_codes(
+            codes, categories=["Before 1950", "1950–1999", "2000 and later"]
         )
-        df_group["Leap_Code"] = df_group["Is_Leap_Year"].astype(int)
 
-        group_year = df_group.groupby("Year_Group", observed=True)["Leap_Code"].agg(["count", "sum", "mean"])
-        group_year = group_year.rename(columns={
-            "count": "Total Years",
-            "sum": "Total Leap Years",
-            "mean": "Leap Year Ratio"
+        # Named aggregations: one groupby per key computes every statistic,
+        # so the group indexer is built only once
+        group_year = df_group.groupby("Year_Group", observed=True).agg(**{
+            "Total Years": ("Leap_Code", "count"),
+            "Total Leap Years": ("Leap_Code", "sum"),
+            "Leap Year Ratio": ("Leap_Code", "mean"),
         })
 
         st.write("Grouped by Year Range:")
         st.write(group_year)
 
         st.subheader("Grouping by Leap_Reason")
-        group_reason = df.groupby("Leap_Reason", observed=True).agg({
-            "Year": ["count", "min", "max"],
-            "Leap_Code": ["sum", "mean"]
-        })
-
-        group_reason = group_reason.rename(columns={
-            "count": "Total Years",
-            "min": "Earliest Year",
-            "max": "Latest Year",
-            "sum": "Total Leap Years",
-            "mean": "Leap Year Ratio"
+        group_reason = df.groupby("Leap_Reason", observed=True).agg(**{
+            "Total Years": ("Year", "count"),
+            "Earliest Year": ("Year", "min"),
+            "Latest Year": ("Year", "max"),
+            "Total Leap Years": ("Leap_Code", "sum"),
+            "Leap Year Ratio": ("Leap_Code", "mean"),
         })
 
         st.write("Grouped by Leap Reason:")
@@ -337,46 +489,24 @@ def main():
     elif section == "7. Visualization":
         st.header("Task 6: Visualization")
 
-        # Line Plot
+        counts = df["Leap_Reason"].value_counts()
+        fig1, fig2, fig3, fig4 = build_figs(
+            df["Year"].to_numpy(dtype=np.float64, na_value=np.nan),
+            df["Leap_Code"].to_numpy(),
+            tuple(str(label) for label in counts.index),
+            counts.to_numpy(),
+        )
+
         st.subheader("Line Plot: Leap_Code over Years")
-        fig1, ax1 = plt.subplots()
-        ax1.plot(df["Year"], df["Leap_Code"])
-        ax1.set_title("Line Plot of Leap Years Over Time")
-        ax1.set_xlabel("Year")
-        ax1.set_ylabel("Leap_Code (1 = Leap, 0 = Non-Leap)")
-        ax1.grid(True)
         st.pyplot(fig1)
 
-        # Bar Chart - Leap Reason counts
         st.subheader("Bar Chart: Leap Reason Counts")
-        counts = df["Leap_Reason"].value_counts()
-        fig2, ax2 = plt.subplots()
-        ax2.bar(counts.index, counts.values)
-        ax2.set_title("Bar Chart of Leap Year Rules")
-        ax2.set_xlabel("Leap Rule Category")
-        ax2.set_ylabel("Count of Years")
-        plt.setp(ax2.get_xticklabels(), rotation=45, ha="right")
-        ax2.grid(True)
         st.pyplot(fig2)
 
-        # Histogram
         st.subheader("Histogram: Leap vs Non-Leap Frequency")
-        fig3, ax3 = plt.subplots()
-        ax3.hist(df["Leap_Code"], bins=2)
-        ax3.set_title("Histogram of Leap vs Non-Leap Years")
-        ax3.set_xlabel("Leap_Code (0 = Non-Leap, 1 = Leap)")
-        ax3.set_ylabel("Frequency")
-        ax3.grid(True)
         st.pyplot(fig3)
 
-        # Scatter Plot
         st.subheader("Scatter Plot: Year vs Leap_Code")
-        fig4, ax4 = plt.subplots()
-        ax4.scatter(df["Year"], df["Leap_Code"])
-        ax4.set_title("Scatter Plot of Leap Years Over Time")
-        ax4.set_xlabel("Year")
-        ax4.set_ylabel("Leap_Code")
-        ax4.grid(True)
         st.pyplot(fig4)
 
     # --------- Section 8: Simple Leap Year Checker ---------